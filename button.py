@@ -47,7 +47,7 @@ class Button(Widget):
             self.window.keypad(1)
 
             # get key press (non-blocking)
-            key = self.window.getch()
+            key = self.getkey()
             # return false on tab, true on enter
             if key == 9:
                 pressed = False
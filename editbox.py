@@ -4,6 +4,26 @@ import curses
 from curses.textpad import rectangle
 from widget import Widget
 
+class _KeyWindow():
+    """
+    Wraps the window handed to Textbox so its key reads go through the
+    owning widget's getkey().
+    """
+    def __init__(self, window, widget):
+        self.__window = window
+        self.__widget = widget
+
+    def getch(self, *args):
+        # Textbox draws without refreshing, this is where getch() would
+        # paint its changes, so report the paint to the session here
+        self.__window.refresh()
+        if self.__widget.session is not None:
+            self.__widget.session.painted()
+        return self.__widget.getkey(self.__window)
+
+    def __getattr__(self, name):
+        return getattr(self.__window, name)
+
 class EditBox(Widget):
     """
     A single line edit box for use in dialogs.
@@ -25,7 +45,7 @@ class EditBox(Widget):
         """
         Set the data for the EditBox.
         """
-        self.__tb = curses.textpad.Textbox(self.__derwin)
+        self.__tb = curses.textpad.Textbox(_KeyWindow(self.__derwin, self))
 
         for ch in data.ljust(self.cols):
             self.__tb.do_command(ch)
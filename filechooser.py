@@ -3,10 +3,7 @@
 import curses
 import curses.ascii
 import os
-
-import listbox
-import editbox
-import button
+import threading
 
 FILE_CHOOSER_ACTION_OPEN = "open"
 FILE_CHOOSER_ACTION_SAVE = "save"
@@ -14,7 +11,16 @@ FILE_CHOOSER_ACTION_SELECT_FOLDER = "folder"
 FILE_CHOOSER_ACTION_CREATE_FOLDER = "mkfolder"
 
 class FileChooser():
-    def __init__(self, window, root, title="File Chooser"):
+    """
+    A file chooser dialog. The dialog frame and current path are painted
+    as soon as it is created. The directory is scanned on a worker thread
+    and the listing is delivered through an UpdateQueue, while the dialog
+    widgets (and their modules) are only created on the first focus().
+
+    If no queue is given the dialog creates its own, call close() when done
+    with the dialog to release it.
+    """
+    def __init__(self, window, root, title="File Chooser", queue=None):
         self.__window = window
         self.__size_y, self.__size_x = self.__window.getmaxyx()
         self.__root = os.path.expanduser(root)
@@ -26,23 +32,24 @@ class FileChooser():
 
         self.__cursor_idx = 0
 
-        listgen = os.walk(self.__cwd)
-        [root, dirs, files] = listgen.next()
-        dirs.sort()
-        filelist = []
-        for entry in dirs:
-            if not entry.startswith('.'):
-                filelist.append(entry)
-
-        print(filelist)
+        # dialog items, created on first focus
+        self.__listing = None
+        self.__diredit = None
+        self.__filelist = None
+        self.__ok_button = None
+        self.__cancel_button = None
+        self.__session = None
 
+        # paint before doing anything slow
         self.refresh()
 
-        # dialog items
-        self.__diredit = editbox.EditBox(self.__window, self.__size_x-4, 3, 2, self.__cwd)
-        self.__filelist = listbox.ListBox(self.__window, self.__size_y-10, self.__size_x-4, 5, 2, files)
-        self.__ok_button = button.Button(self.__window, self.__size_y-3, 15, "OK")
-        self.__cancel_button = button.Button(self.__window, self.__size_y-3, 3, "Cancel")
+        self.__own_queue = queue is None
+        if queue is None:
+            import updatequeue
+            queue = updatequeue.UpdateQueue()
+        self.__queue = queue
+
+        self.__scan(self.__cwd)
 
     def setaction(self, action):
         if action in [FILE_CHOOSER_ACTION_OPEN,
@@ -53,6 +60,83 @@ class FileChooser():
         else:
             raise Exception, "Invalid FileChooser action"
 
+    def setsession(self, session):
+        """
+        Set a SessionRecorder or SessionPlayer for the dialog widgets.
+        """
+        self.__session = session
+        if self.__diredit is not None:
+            for widget in self.__widgets():
+                widget.setsession(session)
+
+    def __widgets(self):
+        return [self.__diredit, self.__filelist, self.__ok_button, self.__cancel_button]
+
+    def setlisting(self, listing):
+        """
+        Set the directory listing shown in the dialog. Called on the UI
+        thread through the UpdateQueue when a scan finishes.
+        """
+        self.__listing = listing
+        if self.__filelist is not None:
+            # a selection made on the old listing means nothing in the new one
+            self.__filelist.getselection().clear()
+            self.__filelist.setdata(self.__listitems())
+
+    def __listitems(self):
+        if self.__listing is None:
+            return ["(loading...)"]
+        if not self.__listing:
+            return ["(empty)"]
+        return self.__listing
+
+    def __scan(self, path):
+        """
+        Read the directory at path on a worker thread and post the listing,
+        directories first, to the UpdateQueue.
+        """
+        show_hidden = self.__show_hidden
+
+        def worker():
+            try:
+                names = os.listdir(path)
+            except OSError:
+                names = []
+            names.sort()
+            dirs = []
+            files = []
+            for name in names:
+                if name.startswith('.') and not show_hidden:
+                    continue
+                if os.path.isdir(os.path.join(path, name)):
+                    dirs.append(name + '/')
+                else:
+                    files.append(name)
+            self.__queue.post(self, 'setlisting', dirs + files)
+
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    def __build(self):
+        """
+        Create the dialog widgets, importing their modules on first use.
+        """
+        if self.__diredit is not None:
+            return
+
+        import listbox
+        import editbox
+        import button
+
+        self.__diredit = editbox.EditBox(self.__window, self.__size_x-4, 3, 2, self.__cwd)
+        self.__filelist = listbox.ListBox(self.__window, self.__size_y-10, self.__size_x-4, 5, 2, self.__listitems())
+        self.__ok_button = button.Button(self.__window, self.__size_y-3, 15, "OK")
+        self.__cancel_button = button.Button(self.__window, self.__size_y-3, 3, "Cancel")
+
+        for widget in self.__widgets():
+            widget.setqueue(self.__queue)
+            widget.setsession(self.__session)
 
     def refresh(self):
         self.__window.clear()
@@ -61,8 +145,14 @@ class FileChooser():
 
         self.__window.addstr(2, 2, "Current Path:")
 
+        if self.__diredit is None:
+            # stand-in for the EditBox until it is created
+            self.__window.addnstr(3, 2, self.__cwd, self.__size_x-4)
+        self.__window.refresh()
+
 
     def focus(self):
+        self.__build()
 
         while 1:
             self.__diredit.focus()
@@ -72,6 +162,14 @@ class FileChooser():
             if self.__ok_button.focus():
                 return True, "filename"
 
+    def close(self):
+        """
+        Release the UpdateQueue if the dialog created it. A queue given by
+        the caller is left open.
+        """
+        if self.__own_queue:
+            self.__queue.close()
+
 
 
 if __name__ == "__main__":
@@ -94,6 +192,7 @@ if __name__ == "__main__":
         fileb = FileChooser(win, '~')
         fileb.setaction(FILE_CHOOSER_ACTION_CREATE_FOLDER)
         ok, filename = fileb.focus()
+        fileb.close()
 
         win.erase()
         stdscr.clear()
@@ -4,12 +4,17 @@ import curses
 import curses.ascii
 from curses.textpad import rectangle
 from widget import Widget
+from selection import Selection
 
 class ListBox(Widget):
     """
     Implements a listbox control using curses.
     Instantiation requires a parent curses window to draw on, desired
     coordinates for the listbox, and a Python list of data to display.
+
+    Items can be selected while the ListBox has focus: space toggles the
+    current item, shift-up/down extends a range from the last toggled item,
+    ctrl-a selects all and '*' inverts the selection.
     """
     def __init__(self, window, rows, cols, y, x, data, color=0):
         Widget.__init__(self, window, rows, cols, y, x, data, color)
@@ -17,9 +22,20 @@ class ListBox(Widget):
         self.__cursor_idx = 0
         self.__data_idx = 0
         self.__page_offset = 0
+        self.__hilited = False
+        self.__selection = Selection()
+        # range selection state, see selectto()
+        self.__anchor_idx = None
+        self.__extent = None
+        self.__extent_idx = None
         # the max index that can be shown in listbox (back out borders and zero)
         self.__max_box_idx = self.rows-3
 
+        # the pad only holds the visible rows, so its size does not depend on
+        # the data set. It is sized -1 instead of -2 (for borders) because to
+        # fill in the appropriate color we need an extra column
+        self.__listwin = curses.newpad(self.rows-2, self.cols-1)
+
         self.setdata(data) # calls refresh()
 
     def setcolor(self, color_pair):
@@ -37,8 +53,18 @@ class ListBox(Widget):
         # draw list bounding box
         curses.textpad.rectangle(self.window, self.y, self.x, self.y+self.rows-1, self.x+self.cols-1)
 
-        # draw visible portion of list box data
-        self.__listwin.overwrite(self.window, self.__page_offset, 0, self.y+1, self.x+1, self.y+self.rows-2, self.x+self.cols-2)
+        # draw the visible items into the pad, blank rows past the end
+        for row in range(self.rows-2):
+            idx = self.__page_offset + row
+            if idx >= len(self.data):
+                self.__listwin.addnstr(row, 0, "".ljust(self.cols-2), self.cols-2, curses.color_pair(self.color_pair))
+            elif self.__hilited and idx == self.__cursor_idx:
+                self.__drawitem(idx, curses.A_REVERSE)
+            else:
+                self.__drawitem(idx)
+
+        # draw list box data
+        self.__listwin.overwrite(self.window, 0, 0, self.y+1, self.x+1, self.y+self.rows-2, self.x+self.cols-2)
         Widget.refresh(self)
 
     def scroll(self, amount):
@@ -83,23 +109,102 @@ class ListBox(Widget):
         # clear old hilite
         self.removehilite()
         # set new hilite and return index of new hilite
-        self.__listwin.addnstr(index, 0, self.data[index], self.cols-2, curses.A_REVERSE)
+        self.__hilited = True
+        self.__drawitem(index, curses.A_REVERSE)
         return index
 
     def removehilite(self):
-        self.__listwin.addnstr(self.__cursor_idx, 0, self.data[self.__cursor_idx], self.cols-2, curses.color_pair(self.color_pair))
+        self.__hilited = False
+        self.__drawitem(self.__cursor_idx)
+
+    def __drawitem(self, idx, attr=0):
+        """
+        Draw the item at idx into the pad, in bold if it is selected. Items
+        outside the visible page or the data set are skipped.
+        """
+        row = idx - self.__page_offset
+        if row < 0 or row > self.__max_box_idx or idx >= len(self.data):
+            return
+        if idx in self.__selection:
+            attr |= curses.A_BOLD
+        self.__listwin.addnstr(row, 0, self.data[idx].ljust(self.cols-2), self.cols-2, attr | curses.color_pair(self.color_pair))
+
+    def getselection(self):
+        """
+        Returns the Selection of indices into the data set.
+        """
+        return self.__selection
+
+    def selecteditems(self):
+        """
+        Lazily yield the selected items in data order.
+        """
+        for idx in self.__selection:
+            yield self.data[idx]
+
+    def toggleselect(self):
+        """
+        Toggle selection of the current item and make it the anchor for
+        range selection.
+        """
+        self.__selection.toggle(self.__cursor_idx)
+        self.__anchor_idx = self.__cursor_idx
+        self.__extent = None
+        self.__extent_idx = self.__cursor_idx
+        self.refresh()
+
+    def selectto(self, amount):
+        """
+        Scroll by amount and select the range from the anchor to the new
+        current item. Repeated calls replace the range selected by the
+        previous one, so the range can grow and shrink. The anchor is the
+        last toggled item, or the current item if the cursor has moved
+        since.
+        """
+        if self.__cursor_idx != self.__extent_idx:
+            self.__anchor_idx = self.__cursor_idx
+            self.__extent = None
+
+        self.scroll(amount)
+
+        if self.__extent is not None:
+            self.__selection.setrange(self.__extent[0], self.__extent[1], False)
+        lo = min(self.__anchor_idx, self.__cursor_idx)
+        hi = max(self.__anchor_idx, self.__cursor_idx) + 1
+        self.__selection.setrange(lo, hi, True)
+        self.__extent = (lo, hi)
+        self.__extent_idx = self.__cursor_idx
+        self.refresh()
+
+    def selectall(self):
+        """
+        Select every item.
+        """
+        self.__selection.selectall()
+        self.refresh()
+
+    def invertselection(self):
+        """
+        Invert the selection.
+        """
+        self.__selection.invert()
+        self.refresh()
 
     def setdata(self, data):
         """
         Update the ListBox data with the given data set.
         """
         Widget.setdata(self, data)
-
-        # the pad is sized -1 instead of -2 (for borders) because to fill in
-        # the appropriate color we need an extra column
-        self.__listwin = curses.newpad(len(data), self.cols-1)
-        for idx, data in enumerate(self.data):
-            self.__listwin.addnstr(idx, 0, data.ljust(self.cols-2), self.cols-2, curses.color_pair(self.color_pair))
+        # keep the selection, dropping indices beyond the new data set
+        self.__selection.resize(len(self.data))
+        if self.__anchor_idx is not None and self.__anchor_idx >= len(self.data):
+            self.__anchor_idx = None
+            self.__extent = None
+            self.__extent_idx = None
+        # keep the cursor inside the new data set
+        if self.__cursor_idx >= len(self.data):
+            self.__cursor_idx = max(len(self.data)-1, 0)
+            self.__page_offset = max(self.__cursor_idx-self.__max_box_idx, 0)
 
         self.refresh()
 
@@ -131,7 +236,7 @@ class ListBox(Widget):
             self.window.keypad(1)
 
             # get key press (non-blocking)
-            key = self.window.getch()
+            key = self.getkey()
             # lose focus on tab or enter
             if key in [9, 10]: break
             # handle arrows and page up/down
@@ -139,6 +244,14 @@ class ListBox(Widget):
             elif key == curses.KEY_DOWN: self.scroll(1)
             elif key == curses.KEY_PPAGE: self.scroll(-10)
             elif key == curses.KEY_NPAGE: self.scroll(10)
+            # handle selection
+            elif key == ord(' '): self.toggleselect()
+            elif key == curses.KEY_SR: self.selectto(-1)
+            elif key == curses.KEY_SF: self.selectto(1)
+            elif key == curses.KEY_SPREVIOUS: self.selectto(-10)
+            elif key == curses.KEY_SNEXT: self.selectto(10)
+            elif key == 1: self.selectall() # ctrl-a
+            elif key == ord('*'): self.invertselection()
             # scroll to first item with pressed alpha key
             elif curses.ascii.isalpha(key):
                 dest = findidx(chr(key))
@@ -149,7 +262,9 @@ class ListBox(Widget):
         # remove hilite when we lose focus
         self.removehilite()
         self.refresh()
-        # return selected item
+        # return selected item, None if the list is empty
+        if not self.data:
+            return None
         return self.data[self.__cursor_idx]
 
 if __name__ == "__main__":
@@ -174,7 +289,7 @@ if __name__ == "__main__":
         win.border()
         win.addstr(0, 2, "[ Window with an embedded ListBox ]")
         win.addstr(2, 3, "Select an item then press tab to")
-        win.addstr(3, 3, "send selection to parent.")
+        win.addstr(3, 3, "send selection to parent. Space, ctrl-a, *")
 
         # generate list of test data
         data = map(lambda x: chr(x)+'_test'+str(x), range(ord('a'),ord('z')))
@@ -187,6 +302,7 @@ if __name__ == "__main__":
         stdscr.clear()
 
         stdscr.addstr(10,10, "Selected item: %s" % selection)
+        stdscr.addstr(12,10, "Multi-selection: %s" % ", ".join(lb.selecteditems()))
         stdscr.getch()
 
     # initiate curses wrapper
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+from bisect import bisect_left, bisect_right
+
+
+class Selection():
+    """
+    A set of selected indices into a dataset of a given size, stored as a
+    sorted list of disjoint half-open ranges plus an inverted flag. Selecting
+    everything or inverting the selection is O(1) in time and memory no
+    matter how large the dataset is.
+    """
+    def __init__(self, size=0):
+        self.__size = size
+        self.clear()
+
+    def __len__(self):
+        count = 0
+        for start, end in zip(self.__starts, self.__ends):
+            count += end - start
+        if self.__inverted:
+            count = self.__size - count
+        return count
+
+    def __contains__(self, idx):
+        if idx < 0 or idx >= self.__size:
+            return False
+        i = bisect_right(self.__starts, idx) - 1
+        hit = i >= 0 and idx < self.__ends[i]
+        return hit != self.__inverted
+
+    def __iter__(self):
+        """
+        Lazily yield the selected indices in ascending order.
+        """
+        # count by hand, range() would build a list on Python 2
+        for start, end in self.ranges():
+            idx = start
+            while idx < end:
+                yield idx
+                idx += 1
+
+    def size(self):
+        """
+        Returns the size of the dataset the selection indexes into.
+        """
+        return self.__size
+
+    def resize(self, size):
+        """
+        Change the size of the dataset. Selected indices beyond the new size
+        are dropped and indices added by growing it are not selected.
+        """
+        if size < self.__size:
+            self.__remove(size, self.__size)
+        elif size > self.__size and self.__inverted:
+            # new indices are stored as selected, which inverts to unselected
+            self.__add(self.__size, size)
+        self.__size = size
+
+    def clear(self):
+        """
+        Deselect everything.
+        """
+        self.__starts = []
+        self.__ends = []
+        self.__inverted = False
+
+    def selectall(self):
+        """
+        Select every index in the dataset.
+        """
+        self.clear()
+        self.__inverted = True
+
+    def invert(self):
+        """
+        Invert the selection.
+        """
+        self.__inverted = not self.__inverted
+
+    def toggle(self, idx):
+        """
+        Toggle selection of a single index. Returns the new state.
+        """
+        state = idx not in self
+        self.setrange(idx, idx+1, state)
+        return state
+
+    def setrange(self, start, end, state=True):
+        """
+        Select (or deselect if state is False) the indices start to end,
+        end not included.
+        """
+        start = max(start, 0)
+        end = min(end, self.__size)
+        if start >= end:
+            return
+        # ranges are stored uninverted, so flip the operation instead
+        if state != self.__inverted:
+            self.__add(start, end)
+        else:
+            self.__remove(start, end)
+
+    def ranges(self):
+        """
+        Lazily yield the selection as (start, end) ranges, end not included.
+        """
+        if not self.__inverted:
+            for start, end in zip(self.__starts, self.__ends):
+                yield start, end
+            return
+
+        # yield the gaps between the stored ranges
+        prev = 0
+        for start, end in zip(self.__starts, self.__ends):
+            if start > prev:
+                yield prev, start
+            prev = end
+        if prev < self.__size:
+            yield prev, self.__size
+
+    def __add(self, start, end):
+        # ranges touching or overlapping [start, end) are merged into one
+        i = bisect_left(self.__ends, start)
+        j = bisect_right(self.__starts, end)
+        if i < j:
+            start = min(start, self.__starts[i])
+            end = max(end, self.__ends[j-1])
+        self.__starts[i:j] = [start]
+        self.__ends[i:j] = [end]
+
+    def __remove(self, start, end):
+        # ranges overlapping [start, end) are cut, keeping any part outside
+        i = bisect_right(self.__ends, start)
+        j = bisect_left(self.__starts, end)
+        if i >= j:
+            return
+        starts = []
+        ends = []
+        if self.__starts[i] < start:
+            starts.append(self.__starts[i])
+            ends.append(start)
+        if self.__ends[j-1] > end:
+            starts.append(end)
+            ends.append(self.__ends[j-1])
+        self.__starts[i:j] = starts
+        self.__ends[i:j] = ends
+
+
+if __name__ == "__main__":
+    import random
+
+    # check against a set of selected indices with random operations
+    for trial in range(200):
+        size = random.randint(0, 60)
+        sel = Selection(size)
+        ref = set()
+        for op in range(100):
+            r = random.random()
+            if r < 0.4 and size:
+                idx = random.randrange(size)
+                sel.toggle(idx)
+                ref ^= set([idx])
+            elif r < 0.7:
+                start = random.randint(-3, size+3)
+                end = random.randint(-3, size+3)
+                state = random.random() < 0.5
+                sel.setrange(start, end, state)
+                span = set(range(max(start, 0), min(end, size)))
+                if state:
+                    ref |= span
+                else:
+                    ref -= span
+            elif r < 0.8:
+                sel.invert()
+                ref = set(range(size)) - ref
+            elif r < 0.85:
+                sel.selectall()
+                ref = set(range(size))
+            elif r < 0.9:
+                sel.clear()
+                ref = set()
+            else:
+                size = random.randint(0, 60)
+                sel.resize(size)
+                ref = set([idx for idx in ref if idx < size])
+
+            assert list(sel) == sorted(ref)
+            assert len(sel) == len(ref)
+            for idx in range(-2, size+2):
+                assert (idx in sel) == (idx in ref)
+
+    # selecting everything must not depend on the dataset size
+    sel = Selection(10000000)
+    sel.selectall()
+    assert len(sel) == 10000000
+    assert next(iter(sel)) == 0
+
+    print("Selection self-test passed.")
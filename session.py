@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+import curses
+import time
+
+
+class SessionRecorder():
+    """
+    Records the keys read by widgets, with the time each key was read, to a
+    file that a SessionPlayer can replay. Give the recorder to every widget
+    in the session with Widget.setsession().
+
+    The file holds one "seconds key" pair per line, with seconds counted
+    from the creation of the recorder.
+    """
+    def __init__(self, filename):
+        self.__file = open(filename, 'w')
+        self.__start = time.time()
+
+    def getkey(self, widget, window):
+        """
+        Read a key with widget.readkey(window), record it and return it.
+        """
+        key = widget.readkey(window)
+        self.__file.write("%.6f %d\n" % (time.time() - self.__start, key))
+        # flush every key so a crash keeps the session that caused it
+        self.__file.flush()
+        return key
+
+    def painted(self):
+        pass
+
+    def close(self):
+        """
+        Flush and close the session file.
+        """
+        self.__file.close()
+
+
+class SessionPlayer():
+    """
+    Replays a session recorded by SessionRecorder. Give the player to every
+    widget in the session with Widget.setsession(); widgets then read their
+    keys from the recording instead of the terminal.
+
+    Keys are delivered with the recorded timing scaled by speed (2.0 plays
+    twice as fast), or as fast as the widgets accept them if speed is None.
+    Updates posted to the widget's UpdateQueue are applied while waiting for
+    a key's time and before it is delivered. For each key the time until
+    the widget next paints with Widget.refresh() is measured as its
+    key-to-paint latency; keys the widget asks past without painting are
+    counted in unpainted instead. Once the recording runs out, keys are
+    read from the terminal again.
+    """
+    def __init__(self, filename, speed=1.0):
+        self.__events = []
+        with open(filename) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                stamp, key = line.split()
+                self.__events.append((float(stamp), int(key)))
+
+        self.__speed = speed
+        self.__idx = 0
+        self.__start = None
+        self.__sent = None
+        self.latencies = []
+        self.unpainted = 0
+
+    def getkey(self, widget, window):
+        """
+        Return the next recorded key, waiting for its time to come if
+        playing at recorded speed.
+        """
+        # getch() refreshes the window before reading, do the same so
+        # widgets that rely on it still paint. This is not the paint of the
+        # last key, the widget may have idled (e.g. napms) since handling it
+        window.refresh()
+        if self.__sent is not None:
+            self.unpainted += 1
+            self.__sent = None
+
+        if self.done():
+            return widget.readkey(window)
+
+        stamp, key = self.__events[self.__idx]
+        self.__idx += 1
+
+        deadline = None
+        if self.__speed:
+            if self.__start is None:
+                self.__start = time.time() - stamp / self.__speed
+            deadline = self.__start + stamp / self.__speed
+
+        # apply updates as they arrive, the way readkey() does while waiting
+        while 1:
+            if widget.queue is not None:
+                widget.queue.process()
+            if deadline is None:
+                break
+            delay = deadline - time.time()
+            if delay <= 0:
+                break
+            if widget.queue is not None:
+                widget.queue.wait(None, delay)
+            else:
+                time.sleep(delay)
+
+        self.__sent = time.time()
+        return key
+
+    def painted(self):
+        """
+        Called when a widget paints, ends the latency measurement of the
+        last delivered key.
+        """
+        if self.__sent is not None:
+            self.latencies.append(time.time() - self.__sent)
+            self.__sent = None
+
+    def done(self):
+        """
+        Returns True once every recorded key has been delivered.
+        """
+        return self.__idx >= len(self.__events)
+
+    def stats(self):
+        """
+        Returns a dict with the count, mean, median, 95th percentile and
+        max of the measured key-to-paint latencies, in seconds, and the
+        number of unpainted keys.
+        """
+        lat = sorted(self.latencies)
+        if not lat:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0,
+                    'unpainted': self.unpainted}
+        return {'count': len(lat),
+                'unpainted': self.unpainted,
+                'mean': sum(lat) / len(lat),
+                'p50': lat[len(lat) // 2],
+                'p95': lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+                'max': lat[-1]}
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from listbox import ListBox
+
+    def main(stdscr):
+        try:
+            curses.use_default_colors()
+            curses.init_pair(1, -1, curses.COLOR_CYAN)
+            curses.init_pair(2, -1, curses.COLOR_BLUE)
+        except:
+            pass
+
+        # add some numbers to background so we can see window
+        for y in range(0, curses.LINES - 1):
+            for x in range(0, curses.COLS):
+                stdscr.addstr("%d" % ((y + x) % 10))
+        stdscr.addstr(curses.LINES - 1, 0, "Press tab to replay.")
+        stdscr.refresh()
+
+        win = stdscr.subwin(22,50,5,5)
+        win.bkgdset(ord(' '), curses.color_pair(1))
+        win.clear()
+        win.border()
+        win.addstr(0, 2, "[ Recording a ListBox session ]")
+
+        data = ["item %d" % i for i in range(1000)]
+        filename = os.path.join(tempfile.gettempdir(), "pycurseslib-session.txt")
+
+        # record a live session
+        recorder = SessionRecorder(filename)
+        lb = ListBox(win, 15, 30, 5, 5, data, 2)
+        lb.setsession(recorder)
+        lb.focus()
+        recorder.close()
+
+        # replay it as fast as possible
+        win.addstr(0, 2, "[ Replaying the ListBox session ]")
+        player = SessionPlayer(filename, None)
+        lb = ListBox(win, 15, 30, 5, 5, data, 2)
+        lb.setsession(player)
+        lb.focus()
+
+        stats = player.stats()
+        win.erase()
+        stdscr.clear()
+
+        stdscr.addstr(10,10, "Replayed keys: %d painted, %d unpainted" %
+                      (stats['count'], stats['unpainted']))
+        stdscr.addstr(12,10, "Key-to-paint latency mean %.2f ms, p95 %.2f ms, max %.2f ms" %
+                      (stats['mean'] * 1000, stats['p95'] * 1000, stats['max'] * 1000))
+        stdscr.getch()
+
+    # initiate curses wrapper
+    curses.wrapper(main)
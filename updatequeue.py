@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+import curses
+import fcntl
+import os
+import select
+import threading
+
+
+class UpdateQueue():
+    """
+    A thread-safe queue of widget updates. Worker threads post method calls
+    on widgets (or any other object, e.g. a PanelStack) and the UI thread
+    applies them between keystrokes. Posting writes a byte to a self-pipe so
+    an input loop blocked waiting for a key wakes up and applies the update
+    right away.
+
+    Updates posted with post() to the same object and method replace any
+    pending update for that pair, so only the latest one is applied.
+    Updates posted with send() are never merged.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending = {}
+        self.__order = []
+        self.__serial = 0
+        self.__signaled = False
+        self.__closed = False
+
+        self.__rfd, self.__wfd = os.pipe()
+        for fd in (self.__rfd, self.__wfd):
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def fileno(self):
+        """
+        Returns the read end of the wakeup pipe, for use with select().
+        """
+        return self.__rfd
+
+    def post(self, target, method, *args):
+        """
+        Queue a call of target.method(*args) on the UI thread. A pending
+        update for the same target and method is replaced.
+        """
+        self.__put((id(target), method), target, method, args)
+
+    def send(self, target, method, *args):
+        """
+        Queue a call of target.method(*args) on the UI thread. The update
+        is never merged with other pending updates.
+        """
+        with self.__lock:
+            self.__serial += 1
+            key = self.__serial
+        self.__put(key, target, method, args)
+
+    def __put(self, key, target, method, args):
+        with self.__lock:
+            if self.__closed:
+                # late posts from workers after close are dropped
+                return
+            if key in self.__pending:
+                # replaced updates move to the back so they still apply
+                # after anything that was posted in between
+                self.__order.remove(key)
+            self.__pending[key] = (target, method, args)
+            self.__order.append(key)
+            wake = not self.__signaled
+            self.__signaled = True
+
+            if wake:
+                try:
+                    os.write(self.__wfd, b'x')
+                except OSError:
+                    # pipe full, the reader will wake up anyway
+                    pass
+
+    def pending(self):
+        """
+        Returns the number of updates waiting to be applied.
+        """
+        with self.__lock:
+            return len(self.__order)
+
+    def process(self):
+        """
+        Apply all pending updates in the order they were posted. Must be
+        called from the UI thread. Returns the number of updates applied.
+        If an update raises, the rest of the batch is still applied and the
+        first exception is raised afterwards.
+        """
+        with self.__lock:
+            updates = [self.__pending[key] for key in self.__order]
+            self.__pending = {}
+            self.__order = []
+            self.__signaled = False
+            if not self.__closed:
+                self.__drain()
+
+        error = None
+        for target, method, args in updates:
+            try:
+                getattr(target, method)(*args)
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+        return len(updates)
+
+    def wait(self, fd, timeout=None):
+        """
+        Block until fd is readable, an update is posted, or timeout seconds
+        pass. Returns True if fd is readable. fd may be None to wait for
+        updates only. Once the queue is closed only fd is waited on.
+        """
+        fds = []
+        if fd is not None:
+            fds.append(fd)
+        with self.__lock:
+            if not self.__closed:
+                fds.append(self.__rfd)
+        try:
+            ready = select.select(fds, [], [], timeout)[0]
+        except select.error:
+            # interrupted, e.g. by SIGWINCH, let the caller poll again
+            return False
+        return fd in ready
+
+    def __drain(self):
+        try:
+            while os.read(self.__rfd, 512):
+                pass
+        except OSError:
+            pass
+
+    def close(self):
+        """
+        Close the wakeup pipe. Updates posted afterwards are dropped.
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            os.close(self.__rfd)
+            os.close(self.__wfd)
+            # the fd numbers may be reused by the next file opened
+            self.__rfd = None
+            self.__wfd = None
+
+
+if __name__ == "__main__":
+    import time
+    from listbox import ListBox
+
+    def main(stdscr):
+        try:
+            curses.use_default_colors()
+            curses.init_pair(1, -1, curses.COLOR_CYAN)
+            curses.init_pair(2, -1, curses.COLOR_BLUE)
+        except:
+            pass
+
+        # add some numbers to background so we can see window
+        for y in range(0, curses.LINES - 1):
+            for x in range(0, curses.COLS):
+                stdscr.addstr("%d" % ((y + x) % 10))
+        stdscr.addstr(curses.LINES - 1, 0, "Press tab to quit.")
+        stdscr.refresh()
+
+        win = stdscr.subwin(22,50,5,5)
+        win.bkgdset(ord(' '), curses.color_pair(1))
+        win.clear()
+        win.border()
+        win.addstr(0, 2, "[ ListBox updated from a thread ]")
+
+        queue = UpdateQueue()
+        lb = ListBox(win, 15, 30, 5, 5, ["waiting..."] * 20, 2)
+        lb.setqueue(queue)
+
+        done = threading.Event()
+        def worker():
+            count = 0
+            while not done.is_set():
+                count += 1
+                # many posts per repaint, only the latest one is applied
+                queue.post(lb, 'setdata', ["tick %d" % (count - i) for i in range(20)])
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+        lb.focus()
+        done.set()
+        thread.join()
+        queue.close()
+
+    # initiate curses wrapper
+    curses.wrapper(main)
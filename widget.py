@@ -1,5 +1,7 @@
 
 
+import sys
+
 
 class Widget():
     """
@@ -12,6 +14,9 @@ class Widget():
         self.y, self.x = (y, x)
         self.rows = rows
         self.cols = cols
+        self.queue = None
+        self.nodelay = False
+        self.session = None
 
     def setdata(self, data):
         """
@@ -24,6 +29,70 @@ class Widget():
         Call a refresh on the base class window object.
         """
         self.window.refresh()
+        if self.session is not None:
+            self.session.painted()
+
+    def setqueue(self, queue):
+        """
+        Set the UpdateQueue whose pending updates are applied while the
+        widget waits for input.
+        """
+        self.queue = queue
+
+    def setnodelay(self, flag):
+        """
+        Set nodelay mode on the widget window. Use this instead of calling
+        window.nodelay() so getkey() can restore the mode after waiting.
+        """
+        self.nodelay = flag
+        self.window.nodelay(flag)
+
+    def setsession(self, session):
+        """
+        Set a SessionRecorder or SessionPlayer that records or supplies the
+        keys read by getkey().
+        """
+        self.session = session
+
+    def getkey(self, window=None):
+        """
+        Wait for a key press on window (defaults to the widget window) and
+        return it. If a session is set, it records or replays the key.
+        """
+        if window is None:
+            window = self.window
+
+        if self.session is not None:
+            return self.session.getkey(self, window)
+        return self.readkey(window)
+
+    def readkey(self, window):
+        """
+        Wait for a key press on window and return it. If an UpdateQueue is
+        set, its updates are applied on this thread while waiting. In nodelay
+        mode it returns -1 instead of waiting when no key is available.
+        """
+        if self.queue is None:
+            return window.getch()
+
+        # only the widget window can have been put in nodelay mode
+        nodelay = self.nodelay and window is self.window
+        if nodelay:
+            self.queue.process()
+            return window.getch()
+
+        window.nodelay(1)
+        try:
+            while 1:
+                self.queue.process()
+                # curses may already hold buffered keys that select() on
+                # stdin cannot see, so poll before blocking
+                key = window.getch()
+                if key != -1:
+                    return key
+                self.queue.wait(sys.stdin.fileno())
+        finally:
+            window.nodelay(nodelay)
 
     def focus(self):
         """